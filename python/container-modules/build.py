@@ -1,21 +1,22 @@
 #!/usr/bin/env python3
 import os
 import sys
+import shlex
 import argparse
 import tomllib
 from pathlib import Path
 from importlib.metadata import distribution
-from PyInstaller.__main__ import run as pyinstaller_run
+
 # ----------------------------------------------------------------------
 base_path = Path(__file__).parent.resolve()
 default_entrypoint = "src/__main__.py"
 parser = argparse.ArgumentParser(description=f"pyinstaller builder")
 parser.add_argument('-s', '--source-path',
-                    metavar='/path/to/src', type=str, default=base_path,
+                    metavar='/path/to/src', type=Path, default=base_path,
                     help=f'Directory containing the source code to build. Default: {base_path}'
                     )
 parser.add_argument('-b', '--build-path',
-                    metavar='/path/to/build', type=str, default=base_path,
+                    metavar='/path/to/build', type=Path, default=base_path,
                     help=f'Directory where the build and dist folders will be created. Default: {base_path}'
                     )
 parser.add_argument('-e', '--entrypoint',
@@ -30,26 +31,29 @@ parser.add_argument('-l', '--log-level',
                     dest="log_level", default="INFO",
                     help='Logging level. Default: INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']
                     )
+parser.add_argument('-v', '--verbose', action='store_true',
+                    help='List each data entry added to the package. Default: False'
+                    )
 
 args = parser.parse_args()
-if not os.path.exists(args.source_path):
+if not args.source_path.exists():
     print(f"[ERROR] Source path: '{args.source_path}' doesn't exist. Unable tp proceed.")
     sys.exit(1)
 
-if not os.path.exists(os.path.join(args.source_path, "pyproject.toml")):
+if not (args.source_path / "pyproject.toml").exists():
     print(f"[ERROR] project file ('pyproject.toml') not found is source: '{args.source_path}'. Unable tp proceed.")
     sys.exit(1)
 
-if not os.path.exists(args.build_path):
-    os.makedirs(args.build_path)
+args.build_path.mkdir(parents=True, exist_ok=True)
 
 # Change into the source path directory
 os.chdir(args.source_path)
-build_path = os.path.join(args.build_path, "build")
-dist_path = os.path.join(args.build_path, "dist")
+build_path = args.build_path / "build"
+dist_path = args.build_path / "dist"
 
 # Load project metadata from pyinstaller.toml
-config = tomllib.loads(Path("pyproject.toml").read_text())
+with open("pyproject.toml", "rb") as project_file:
+    config = tomllib.load(project_file)
 meta = config["project"]
 name = meta["name"]
 pkg_name = name.replace("-", "_")
@@ -62,8 +66,8 @@ log_level = build_cfg.get("log_level", "INFO")
 dist_info_path = distribution(name)._path
 
 # ---- MAIN BUILD PROCESS ----
-print(f"INFO: Building {name} v{meta['version']}")
-# "--add-data", f"{os.path.join(base_path, "src", pkg_name)}.egg-info:{pkg_name}.egg-info",
+build_log = [f"INFO: Building {name} v{meta['version']}"]
+# "--add-data", f"{base_path / 'src' / pkg_name}.egg-info:{pkg_name}.egg-info",
 opts = [
     entry , "--clean", "--log-level", args.log_level, "--name", name, '--noconfirm',
     "--distpath", f"{dist_path}", "--workpath", f"{build_path}",
@@ -76,13 +80,18 @@ datas = build_cfg.get("datas", [])
 for data_entry in datas:
     src, dest = data_entry
     if dest == ".":
-        dest = os.path.basename(src)
+        dest = Path(src).name
     opts += ["--add-data", f"{src}:{dest}"]
-    print("INFO: Adding data:", f"{src}:{dest}")
+    if args.verbose:
+        build_log.append(f"INFO: Adding data: {src}:{dest}")
 
-# Include package datas from args
+# Include package datas from args: "src" lands next to the bundle root as its basename, "src:dest" as given
 for data_entry in args.add_data:
-    datas.append(data_entry)
+    src, _, dest = data_entry.partition(":")
+    dest = dest or Path(src).name
+    opts += ["--add-data", f"{src}:{dest}"]
+    if args.verbose:
+        build_log.append(f"INFO: Adding data: {src}:{dest}")
 
 # Flags
 if build_cfg.get("onefile", True):
@@ -95,18 +104,20 @@ icon = build_cfg.get("icon")
 if icon and Path(icon).exists():
     opts += ["--icon", icon]
 
-print("----------------------------------------")
-print("INFO: Running PyInstaller with options:")
-print("----------------------------------------")
-for opt in opts:
-    ln = "" if opt.startswith("--") else "\n"
-    print("  ", opt, end=ln)
-print("\n----------------------------------------")
+build_log += [
+    f"INFO: {opts.count('--add-data')} data entries, onefile={build_cfg.get('onefile', True)}",
+    f"INFO: Running PyInstaller: {shlex.join(opts)}",
+]
+# Emit the whole build summary in a single write
+sys.stdout.write("\n".join(build_log) + "\n")
+sys.stdout.flush()
 
 try:
+    # Imported late: PyInstaller is heavy and only needed once the options are ready
+    from PyInstaller.__main__ import run as pyinstaller_run
     pyinstaller_run(opts)
     # Rename output file to a generic name for the Containerfile to use
-    os.rename(os.path.join(dist_path, name), os.path.join(dist_path, "app.bin"))
+    (dist_path / name).rename(dist_path / "app.bin")
 except Exception as e:
     print("[ERROR] Build failed:", e)
     exit(1)
@@ -61,7 +61,7 @@ class App:
         ).args
 
         # Use a configuration file if one is specified. Save the values into self.args.
-        if hasattr(self.args, "config_file") and self.args.config_file and isinstance(self.args.config_file, str):
+        if isinstance(getattr(self.args, "config_file", None), str) and self.args.config_file:
             self.args.config_file = os.path.realpath(self.args.config_file)
             if not os.path.isfile(self.args.config_file):
                 self.logger.warning(f"Configuration file not found: '{self.args.config_file}'")
@@ -2,10 +2,12 @@ import os
 import argparse
 from .logger import (AppLogger, LOG_LEVELS)
 
+# Env var strings EnvDefault converts to booleans
+BOOL_STRINGS = {"true": True, "1": True, "false": False, "0": False}
+
 class EnvDefault(argparse.Action):
     """ Argparse Action that uses ENV Vars for default values """
     def __init__(self, envvar, required=False, default=None, **kwargs):
-        bset = {"true": True, "1": True, "false": False, "0": False}
         if envvar:
             # If passed a string, convert to a list
             if isinstance(envvar, str):
@@ -15,10 +17,12 @@ class EnvDefault(argparse.Action):
                 # Allow env var defaults
                 if varname in os.environ:
                     # Convert boolean strings to bool
-                    if os.environ[varname].lower() in bset.keys() and "type" in kwargs and kwargs["type"] in [bool, str]:
-                        default = bset[os.environ[varname].lower()]
+                    value = os.environ[varname]
+                    lowered = value.lower()
+                    if lowered in BOOL_STRINGS and kwargs.get("type") in (bool, str):
+                        default = BOOL_STRINGS[lowered]
                     else:
-                        default = os.environ[varname]
+                        default = value
                     required = False
                     break
 
@@ -1,16 +1,24 @@
 #!/usr/bin/env python3
-import os
-import subprocess
+import sys
+import shlex
+import argparse
 import tomllib
 from pathlib import Path
 from importlib.metadata import distribution
-from PyInstaller.__main__ import run as pyinstaller_run
+
 # ----------------------------------------------------------------------
+parser = argparse.ArgumentParser(description="pyinstaller builder")
+parser.add_argument('-v', '--verbose', action='store_true',
+                    help='List each data entry added to the package. Default: False'
+                    )
+args = parser.parse_args()
+
 base_path = Path(__file__).parent.resolve()
-build_path = os.path.join(base_path, "build")
-dist_path = os.path.join(base_path, "dist")
+build_path = base_path / "build"
+dist_path = base_path / "dist"
 
-config = tomllib.loads(Path("pyproject.toml").read_text())
+with open("pyproject.toml", "rb") as project_file:
+    config = tomllib.load(project_file)
 meta = config["project"]
 name = meta["name"]
 pkg_name = name.replace("-", "_")
@@ -24,26 +32,28 @@ dist_info_path = distribution(name)._path
 
 # ---- MAIN BUILD PROCESS ----
 
-print(f"INFO: Building {name} v{meta['version']}")
+build_log = [f"INFO: Building {name} v{meta['version']}"]
 
 opts = [
     entry , "--clean", "--log-level", log_level, "--name", name,
     "--distpath", f"{dist_path}", "--workpath", f"{build_path}",
-    "--add-data", f"{os.path.join(base_path, "src", pkg_name)}.egg-info:{pkg_name}.egg-info"
+    "--add-data", f"{base_path / 'src' / pkg_name}.egg-info:{pkg_name}.egg-info"
     ]
 
 # Include package data
 opts += ["--add-data", f"{dist_info_path}:{Path(dist_info_path).name}"]
-print("INFO: Adding data:", f"{dist_info_path}:{Path(dist_info_path).name}")
+if args.verbose:
+    build_log.append(f"INFO: Adding data: {dist_info_path}:{Path(dist_info_path).name}")
 
 # include datas from build_cfg
 datas = build_cfg.get("datas", [])
 for data_entry in datas:
     src, dest = data_entry
     if dest == ".":
-        dest = os.path.basename(src)
+        dest = Path(src).name
     opts += ["--add-data", f"{src}:{dest}"]
-    print("INFO: Adding data:", f"{src}:{dest}")
+    if args.verbose:
+        build_log.append(f"INFO: Adding data: {src}:{dest}")
 
 # Flags
 if build_cfg.get("onefile", True):
@@ -56,17 +66,19 @@ icon = build_cfg.get("icon")
 if icon and Path(icon).exists():
     opts += ["--icon", icon]
 
-print("----------------------------------------")
-print("INFO: Running PyInstaller with options:")
-print("----------------------------------------")
-for opt in opts:
-    ln = "" if opt.startswith("--") else "\n"
-    print("  ", opt, end=ln)
-print("\n----------------------------------------")
+build_log += [
+    f"INFO: {len(datas) + 2} data entries, onefile={build_cfg.get('onefile', True)}",
+    f"INFO: Running PyInstaller: {shlex.join(opts)}",
+]
+# Emit the whole build summary in a single write
+sys.stdout.write("\n".join(build_log) + "\n")
+sys.stdout.flush()
 try:
+    # Imported late: PyInstaller is heavy and only needed once the options are ready
+    from PyInstaller.__main__ import run as pyinstaller_run
     pyinstaller_run(opts)
     # Rename output file to a generic name for the Containerfile to use
-    os.rename(os.path.join(dist_path, name), os.path.join(dist_path, "app.bin"))
+    (dist_path / name).rename(dist_path / "app.bin")
 except Exception as e:
     print("[ERROR] Build failed:", e)
     exit(1)
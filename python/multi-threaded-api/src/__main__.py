@@ -1,13 +1,23 @@
-import os
 import sys
 import signal
-import time
+import threading
+import multiprocessing
+
+# uvicorn starts its workers with the "spawn" context. In the frozen (PyInstaller) build the
+# child re-runs this executable, so hand it to multiprocessing before App() parses argv.
+multiprocessing.freeze_support()
+
 from app import App
-from httpapi import FastAPI, FastAPIThreadedServer
 
-# Create a base app object
-app = App()
+# Shutdown signals are blocked before any thread starts (new threads inherit the mask) and
+# taken synchronously by a dedicated sigwait thread, so no handler interrupts whichever thread
+# happens to be running. Platforms without pthread_sigmask (Windows) use a signal handler.
+SHUTDOWN_SIGNALS = {signal.SIGINT, signal.SIGTERM}
+
+app = None
 api = None
+# Set on a shutdown signal; the main thread blocks on it until shutdown
+stop_event = threading.Event()
 
 
 def shutdown(exit_code: int = 0, error_msg: str = None, sig_id: int = None) -> None:
@@ -16,35 +26,72 @@ def shutdown(exit_code: int = 0, error_msg: str = None, sig_id: int = None) -> N
         api.stop()
     sys.exit(exit_code)
 
-# Signal Handler: capture ctrl-C and clean exit
+# Signal Handler: capture ctrl-C / SIGTERM and wake the main thread
 def signal_handler(sig_id, frame):
-    shutdown(exit_code=0, sig_id=sig_id)
-signal.signal(signal.SIGINT, signal_handler)
+    stop_event.set()
+
+def start_signal_watcher() -> None:
+    """ Set stop_event when a shutdown signal arrives """
+    if not hasattr(signal, "pthread_sigmask"):
+        signal.signal(signal.SIGINT, signal_handler)
+        signal.signal(signal.SIGTERM, signal_handler)
+        return
+
+    def _sigwait():
+        signal.sigwait(SHUTDOWN_SIGNALS)
+        stop_event.set()
+    threading.Thread(target=_sigwait, name="signal-watcher", daemon=True).start()
 
 
+# spawn / forkserver children re-import this file as __mp_main__: only the real entry point
+# masks the signals and builds the App
 if __name__ == "__main__":
+    # App() starts the log flusher thread, so block the signals first
+    if hasattr(signal, "pthread_sigmask"):
+        signal.pthread_sigmask(signal.SIG_BLOCK, SHUTDOWN_SIGNALS)
+    # Create a base app object
+    app = App()
+
     # Perform build test and exit
     if app.args.build_test:
         app.logger.info("Build test complete")
         sys.exit(0)
 
-    
-    # Start the FastAPI server in a background thread
+    # Deferred until after the build test so --help / --build-test don't pay for the FastAPI/uvicorn imports
+    from httpapi import FastAPIThreadedServer
+
     api = FastAPIThreadedServer(
         logger_config = app.logger_config,
         api_config = app.api_config,
         uvc_config = app.uvc_config,
         meta = app.meta,
+        task_workers = app.task_workers,
+        cpu_workers = app.cpu_cores,
         )
+
+    if app.uvc_config.workers > 1:
+        # uvicorn supervises the worker processes in the foreground until it is signalled; it
+        # installs its own handlers, and the spawned workers inherit the mask, so unblock first
+        if hasattr(signal, "pthread_sigmask"):
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, SHUTDOWN_SIGNALS)
+        api.start_multiprocess()
+        app.logger.info("Server stopped")
+        shutdown(exit_code=0)
+
+    # Single worker: start the FastAPI server in a background thread
+    start_signal_watcher()
     api.start()
 
-    app.logger.info(f"API Server running – hit {app.uvc_config.docs_url}")
+    if app.api_config.openapi_url is not None:
+        app.logger.info(f"API Server running – hit {app.uvc_config.docs_url}")
+    else:
+        app.logger.info(f"API Server running on {app.uvc_config.host}:{app.uvc_config.port} (OpenAPI disabled)")
     app.logger.info("Press Ctrl-C to stop the server")
 
-    # Keep the main thread alive while the server is running
-    while True:
-        time.sleep(30)
+    # Keep the main thread parked until a shutdown signal is received
+    stop_event.wait()
 
     # Shut everything down
     api.stop()
-    app.logger.info("Server stopped")
\ No newline at end of file
+    app.logger.info("Server stopped")
+    shutdown(exit_code=0)
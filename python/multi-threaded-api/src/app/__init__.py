@@ -2,130 +2,259 @@
 Application object for basic application information and command-line arguments and logging
 """
 import os
-import datetime
+import time
+import functools
+import importlib.util
 import logging
-import logging.config
-from logging import DEBUG, INFO, WARNING, ERROR, CRITICAL
-from dataclasses import dataclass
+from logging import DEBUG, INFO, WARNING
+from dataclasses import dataclass, fields
 from importlib import metadata
-from packaging.version import Version, parse
+from typing import TYPE_CHECKING
 from .config import LOGGING_CONFIG
-from .constants import BASE_DIR, LOG_LEVELS, LOG_FORMATS, DATE_FORMAT
+from .constants import BASE_DIR, LOG_LEVELS, LOG_FORMATS
 from .arguments import Arguments
+if TYPE_CHECKING:
+    from packaging.version import Version
 init_log: list[tuple[int, str]] = [] 
+# Year for the copyright notice, looked up once at import
+_YEAR = time.gmtime().tm_year
 
 class App:
     """ Base application configuration """
     # Must match pyproject.toml
     PROJECT_NAME = "template-api"
+    # (logger name, level, format, access log) of the last applied logging configuration
+    _logging_key: tuple | None = None
     
     def __init__(self) -> None:
-        # Set applcation defalts
-        # print(metadata.distribution(self.PROJECT_NAME)._path)
-
-        # Calculate number of fastAPI workers
-        num_cpu_cores = os.cpu_count() if os.cpu_count() is not None else 1
-        num_workers = (num_cpu_cores - 1)
+        # Number of CPU cores used for sizing the HTTP workers. Prefer the affinity mask
+        # so a container pinned to a cpuset does not size itself for the whole host.
+        if hasattr(os, "sched_getaffinity"):
+            self.cpu_cores = len(os.sched_getaffinity(0))
+        else:
+            self.cpu_cores = os.cpu_count() or 1
 
         # initialize application metadata
-        self.meta = AppMetadata(self.PROJECT_NAME, static_dir=f"{BASE_DIR}/static")
+        self.meta = AppMetadata.load(self.PROJECT_NAME, static_dir=f"{BASE_DIR}/static")
         init_log.append((INFO, f"Initializing application: {self.meta.name} v{self.meta.version} [license: {self.meta.license}]"))
         self.base_dir = BASE_DIR
-        init_log.append((DEBUG, f"Base directory set to: {self.base_dir}"))
         
         # initialize application arguments
         self.args = Arguments(self).args
         
-        # initialize TLS options
-        self.tls_config = TlsConfig(self.args)
-        init_log.append((DEBUG, f"Logging: Level: {self.args.log_level}"))
-        init_log.append((DEBUG, f"HTTP: TLS/SSL Enabled: {self.tls_config.enabled}"))
-
-        # initialize logging options
-        self.logger_config = LoggerConfig(self.args, logger_name=self.meta.name)
+        # initialize logging and TLS options
+        self.logger_config = LoggerConfig.from_args(self.args, name=self.meta.name)
+        self.tls_config = TlsConfig.from_args(self.args)
+        # debug is the only level that emits DEBUG, so only format those messages when it is set
+        debug = self.logger_config.debug
+        if debug:
+            init_log.extend([
+                (DEBUG, f"Base directory set to: {self.base_dir}"),
+                (DEBUG, f"Distribution path: {_dist(self.PROJECT_NAME).locate_file('')}"),
+                (DEBUG, f"Logging: Level: {self.args.log_level}"),
+                (DEBUG, f"HTTP: TLS/SSL Enabled: {self.tls_config.enabled}"),
+            ])
         init_log.append((INFO, f"HTTP: Access Log Enabled: {self.logger_config.access_log}"))
-        init_log.append((DEBUG, f"HTTP: Reload on changes: {self.logger_config.debug}"))
+        if debug:
+            init_log.append((DEBUG, f"HTTP: Reload on changes: {self.logger_config.debug}"))
+
+        # Number of uvicorn workers: the threaded server is a single process unless
+        # --workers / WEB_CONCURRENCY asks for more (2N+1 is the usual I/O-bound choice)
+        if self.args.workers:
+            num_workers, workers_reason = int(self.args.workers), "set by --workers / WEB_CONCURRENCY"
+        else:
+            num_workers, workers_reason = 1, f"threaded server; set --workers {(2 * self.cpu_cores) + 1} for 2N+1 processes"
+
+        # Number of consumers draining the task queue
+        self.task_workers = int(self.args.task_workers) if self.args.task_workers else self.cpu_cores
+
+        # Size of the thread pool used for blocking work in sync routes
+        thread_pool_size = int(self.args.thread_pool_size) if self.args.thread_pool_size else (2 * self.cpu_cores) + 4
 
         # initialize uvicorn and FastAPI options
-        self.uvc_config = UvicornConfig(args=self.args, logger_config=self.logger_config, tls_config=self.tls_config, workers=num_workers)
-        self.api_config = FastAPIConfig(meta=self.meta, logger_config=self.logger_config)
-        init_log.append((DEBUG, f"Using {num_workers} HTTP worker(s) for {num_cpu_cores} CPU core(s)."))
+        self.uvc_config = UvicornConfig.from_args(self.args, logger_config=self.logger_config, tls_config=self.tls_config,
+                                                  workers=num_workers, thread_pool_size=thread_pool_size)
+        self.api_config = FastAPIConfig.from_meta(self.meta, logger_config=self.logger_config,
+                                               openapi=not self.args.no_openapi)
+        if self.uvc_config.reload:
+            workers_reason = "reload enabled"
+        init_log.append((INFO, f"Using {self.uvc_config.workers} HTTP worker(s) for {self.cpu_cores} CPU core(s) ({workers_reason})."))
+        if self.args.workers and self.uvc_config.workers > (2 * self.cpu_cores) + 1:
+            init_log.append((WARNING, f"--workers / WEB_CONCURRENCY ({self.uvc_config.workers}) exceeds 2N+1 ({(2 * self.cpu_cores) + 1}) for {self.cpu_cores} CPU core(s); worker processes will contend for CPU."))
+        if debug:
+            init_log.extend([
+                (DEBUG, f"Using {self.uvc_config.thread_pool_size} thread(s) for blocking work per HTTP worker."),
+                (DEBUG, f"Using {self.task_workers} task worker(s)."),
+                (DEBUG, f"HTTP: Event loop: {self.uvc_config.loop}, protocol: {self.uvc_config.http}"),
+            ])
         
         # Setup logger
         self.logger = self._setup_logger()
 
         # Flush init log messages
-        for lvl, txt in init_log:
-            self.logger.log(lvl, txt)
-        init_log.clear()
+        self._flush_init_log()
 
     @property
     def name(self) -> str:
         """ Application name """
         return self.meta.name
     @property
-    def version(self) -> Version:
+    def version(self) -> str:
         """ Application version """
         return self.meta.version
 
+    def _flush_init_log(self) -> None:
+        """ Emit the queued init log messages with one locked write per handler """
+        fn, lno, func, _ = self.logger.findCaller()
+        records = [
+            self.logger.makeRecord(self.logger.name, lvl, fn, lno, txt, None, None, func)
+            for lvl, txt in init_log if self.logger.isEnabledFor(lvl)
+        ]
+        init_log.clear()
+        for handler in self.logger.handlers:
+            handled = [record for record in records if record.levelno >= handler.level and handler.filter(record)]
+            if not handled:
+                continue
+            if not isinstance(handler, logging.StreamHandler):
+                # e.g. the buffered handler: queue the batch and push it out now
+                for record in handled:
+                    handler.handle(record)
+                handler.flush()
+                continue
+            blob = "".join(handler.format(record) + handler.terminator for record in handled)
+            with handler.lock:
+                handler.stream.write(blob)
+                handler.flush()
+
     def _setup_logger(self) -> logging.Logger:
         """ Setup the application logger """
-        log_level = logging.getLevelName(self.logger_config.level.upper())
+        # Skip reconfiguring logging when nothing changed since the last App()
+        logging_key = (self.logger_config.name, self.logger_config.level, self.logger_config.format,
+                       self.logger_config.access_log)
+        if logging_key != App._logging_key:
+            # imported here so --help / --version exits don't pay for it
+            from logging.config import dictConfig
+            # customize a copy of the logging configuration; LOGGING_CONFIG is a shared template.
+            # dictConfig pops keys from formatter and handler entries, so those get their own dicts.
+            level_no = self.logger_config.level_no
+            handlers = {name: dict(config) for name, config in LOGGING_CONFIG["handlers"].items()}
+            handlers["default"].update(formatter=self.logger_config.format, level=level_no)
+            logging_config = {
+                **LOGGING_CONFIG,
+                "formatters": {name: dict(config) for name, config in LOGGING_CONFIG["formatters"].items()},
+                "handlers": handlers,
+                # the template "api" logger becomes the application logger
+                "loggers": {
+                    (self.logger_config.name if name == "api" else name): {**config, "level": level_no}
+                    for name, config in LOGGING_CONFIG["loggers"].items()
+                },
+                "root": {**LOGGING_CONFIG["root"], "level": level_no},
+            }
+            dictConfig(logging_config)
+            App._logging_key = logging_key
 
-        # customize the logging configuration
-        logging_config = LOGGING_CONFIG.copy()
+        logger = logging.getLogger(self.logger_config.name)
+        logger.setLevel(self.logger_config.level_no)
 
-        logging_config["loggers"][self.logger_config.name] = logging_config["loggers"]["api"]
-        del(logging_config["loggers"]["api"])
+        return logger
 
-        for key, config in logging_config["loggers"].items():
-            config["level"] = self.logger_config.level.upper()
-        
-        logging_config["root"]["level"] = self.logger_config.level.upper()
-        logging_config["handlers"]["default"]["formatter"] = self.logger_config.format
-        logging_config["handlers"]["default"]["level"] = self.logger_config.level.upper()
-        logging.config.dictConfig(logging_config)
+@functools.lru_cache(maxsize=None)
+def _dist(project_name: str) -> metadata.Distribution:
+    """ Locate the installed distribution once per process; its METADATA is parsed on first access """
+    return metadata.distribution(project_name)
 
-        logger = logging.getLogger(self.logger_config.name)
-        logger.setLevel(self.logger_config.level.upper())
+@functools.lru_cache(maxsize=None)
+def _has_module(name: str) -> bool:
+    """ Check whether an optional module is installed without importing it """
+    return importlib.util.find_spec(name) is not None
 
-        return logger
+@functools.lru_cache(maxsize=None)
+def _parse_version(version: str) -> "Version":
+    """ Parse a version string on demand; packaging pulls in re and its PEP 440 parser """
+    from packaging.version import Version
+    return Version(version)
 
+@dataclass(frozen=True, slots=True)
 class AppMetadata:
     """ Application metadata dataclass """
-    def __init__(self, project_name: str, static_dir: str) -> None:
-        meta = metadata.metadata(project_name)
-        self.name = meta["Name"]
-        self.version = Version(meta["Version"])
-        self.description = meta["Summary"]
-        self.author = meta["Author-email"]
-        self.license = meta["License-Expression"]
-        self.static_dir = static_dir
-        self.copyright = f"\u00A9 {datetime.datetime.today().year} {self.author}"
-        self.footer = f"{self.name} | {self.copyright}"
+    name: str
+    version: str
+    description: str
+    author: str
+    license: str
+    static_dir: str
+    copyright: str
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def load(cls, project_name: str, static_dir: str) -> "AppMetadata":
+        """ Build the metadata from the installed package; the frozen result is shared by every App() """
+        meta = _dist(project_name).metadata
+        name = meta["Name"]
+        author = meta["Author-email"]
+        copyright = f"\u00A9 {_YEAR} {author}"
+        return cls(
+            name=name,
+            version=meta["Version"],
+            description=meta["Summary"],
+            author=author,
+            license=meta["License-Expression"],
+            static_dir=static_dir,
+            copyright=copyright,
+        )
+
+    @property
+    def footer(self) -> str:
+        """ Page footer text; built on access since nothing needs it at startup """
+        return f"{self.name} | {self.copyright}"
+
+    def parsed_version(self) -> "Version":
+        """ The version as a packaging Version, for comparisons """
+        return _parse_version(self.version)
 
       
+@dataclass(frozen=True, slots=True)
 class LoggerConfig:
     """ Logging options dataclass """
-    def __init__(self, args: Arguments, logger_name: str) -> None:
-        self.name = logger_name
-        self.debug = False
-        self.level = args.log_level if args.log_level in LOG_LEVELS else "info"
-        self.access_log = not args.no_access_log if hasattr(args, 'no_access_log') else True
-        self.format = args.log_format if args.log_format in LOG_FORMATS else "default"
-        # if the log level is debug, force the log format to debug
-        if self.level == "debug":
-            self.debug = True
-            # self.format = "debug"
+    name: str
+    debug: bool
+    level: str
+    level_no: int
+    access_log: bool
+    format: str
 
+    @classmethod
+    def from_args(cls, args: Arguments, name: str) -> "LoggerConfig":
+        level = args.log_level if args.log_level in LOG_LEVELS else "info"
+        debug = level == "debug"
+        return cls(
+            name=name,
+            debug=debug,
+            level=level,
+            level_no=logging.getLevelNamesMapping()[level.upper()],
+            access_log=not args.no_access_log,
+            # if the log level is debug, force the log format to debug
+            format="debug" if debug else (args.log_format if args.log_format in LOG_FORMATS else "default"),
+        )
+
+@dataclass(frozen=True, slots=True)
 class TlsConfig:
     """ TLS options dataclass """
-    def __init__(self, args: Arguments) -> None:
-        self.auto = args.tls_auto if hasattr(args, 'tls_auto') else False
-        self.cert = args.tls_cert if hasattr(args, 'tls_cert') else None
-        self.key = args.tls_key if hasattr(args, 'tls_key') else None
-        self.ca = args.tls_ca if hasattr(args, 'tls_ca') else None
-        self.enabled = self.auto or (self.cert is not None and self.key is not None)
+    auto: bool
+    cert: str | None
+    key: str | None
+    ca: str | None
+    enabled: bool
+
+    @classmethod
+    def from_args(cls, args: Arguments) -> "TlsConfig":
+        return cls(
+            auto=args.tls_auto,
+            cert=args.tls_cert,
+            key=args.tls_key,
+            ca=args.tls_ca,
+            enabled=args.tls_auto or (args.tls_cert is not None and args.tls_key is not None),
+        )
     
     @property
     def protocol(self) -> str:
@@ -135,19 +264,46 @@ class TlsConfig:
     def __bool__(self) -> bool:
         return self.enabled
 
+@dataclass(frozen=True, slots=True)
 class UvicornConfig:
     """ uvicorn options dataclass """
-    def __init__(self, args: Arguments, logger_config: LoggerConfig, tls_config: TlsConfig, workers: int = 1) -> None:
-        self.host = str(args.http_host) if hasattr(args, 'http_host') else "0.0.0.0"
-        self.port = args.http_port if hasattr(args, 'http_port') else 3000
-        self.proxy_headers=True
-        self.log_level = logger_config.level
-        self.access_log = logger_config.access_log
-        self.reload = logger_config.debug
-        self.workers = workers
-        self.ssl_keyfile=tls_config.key
-        self.ssl_certfile=tls_config.cert
-        self.ssl_ca_certs=tls_config.ca
+    host: str
+    port: int
+    log_level: str
+    access_log: bool
+    reload: bool
+    ssl_keyfile: str | None
+    ssl_certfile: str | None
+    ssl_ca_certs: str | None
+    workers: int = 1
+    thread_pool_size: int = 8
+    proxy_headers: bool = True
+    loop: str = "auto"
+    http: str = "auto"
+
+    @classmethod
+    def from_args(cls, args: Arguments, logger_config: LoggerConfig, tls_config: TlsConfig,
+                  workers: int = 1, thread_pool_size: int = 8) -> "UvicornConfig":
+        return cls(
+            host=str(args.http_host),
+            port=args.http_port,
+            log_level=logger_config.level,
+            access_log=logger_config.access_log,
+            reload=logger_config.debug,
+            ssl_keyfile=tls_config.key,
+            ssl_certfile=tls_config.cert,
+            ssl_ca_certs=tls_config.ca,
+            # uvicorn only supports a single worker in reload mode
+            workers=1 if logger_config.debug else workers,
+            thread_pool_size=thread_pool_size,
+            # pin the C implementations when installed; "auto" silently falls back to asyncio/h11
+            loop="uvloop" if _has_module("uvloop") else "asyncio",
+            http="httptools" if _has_module("httptools") else "h11",
+        )
+
+    def uvicorn_options(self) -> dict:
+        """ Return only the options understood by uvicorn.Config """
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.name != "thread_pool_size"}
 
     @property
     def docs_url(self) -> str:
@@ -155,10 +311,22 @@ class UvicornConfig:
         proto = "https" if self.ssl_certfile and self.ssl_keyfile else "http"
         return f"{proto}://{self.host}:{self.port}/docs"
 
+@dataclass(frozen=True, slots=True)
 class FastAPIConfig:
     """ FastAPI options dataclass """
-    def __init__(self, meta: AppMetadata, logger_config: LoggerConfig) -> None:
-        self.title = meta.name
-        self.summary = meta.description
-        self.version = str(meta.version)
-        self.reload = logger_config.debug
\ No newline at end of file
+    title: str
+    summary: str
+    version: str
+    reload: bool
+    # None disables the OpenAPI schema and the /docs UI
+    openapi_url: str | None = "/openapi.json"
+
+    @classmethod
+    def from_meta(cls, meta: AppMetadata, logger_config: LoggerConfig, openapi: bool = True) -> "FastAPIConfig":
+        return cls(
+            title=meta.name,
+            summary=meta.description,
+            version=meta.version,
+            reload=logger_config.debug,
+            openapi_url="/openapi.json" if openapi else None,
+        )
@@ -0,0 +1,78 @@
+import argparse
+import os
+from typing import Any
+
+# Strings EnvDefault treats as booleans
+_TRUE = frozenset({"true", "t", "yes", "y", "1"})
+_FALSE = frozenset({"false", "f", "no", "n", "0"})
+
+
+class EnvDefault(argparse.Action):
+    """
+    Argparse Action that uses an environment variable as the default value.
+    It respects the argument's ``type=`` conversion and does **not** apply it
+    twice.  It also knows how to coerce common textual representations of
+    booleans (e.g. "yes"/"no", "1"/"0").
+    """
+
+    def __init__(
+        self,
+        option_strings,
+        dest,
+        *,
+        envvar: str | None = None,
+        required: bool = False,
+        default: Any = None,
+        **kwargs,
+    ):
+        """
+        Parameters
+        ----------
+        option_strings : list[str]
+            Passed straight from argparse (e.g. ['-l', '--listen']).
+        dest : str
+            Destination attribute name (also from argparse).
+        envvar : str | None
+            Name of the environment variable that should supply the default.
+        required : bool
+            Whether the argument is required *if* the env‑var is missing.
+        default : Any
+            The normal argparse default (used when envvar is not set).
+        kwargs :
+            Any other kwargs that argparse expects (e.g. ``help=``).
+        """
+        self.envvar = envvar
+
+        # If the env‑var exists, use its value as the *default* for argparse.
+        # Otherwise keep the user‑supplied default.
+        # One environ lookup per action (``os.environ`` encodes the key on every access).
+        raw = os.environ.get(envvar) if envvar else None
+        if raw is not None:
+            # Defer type conversion – we just store the raw string.
+            # ``boolify`` is only applied for boolean‑like arguments.
+            default = self._maybe_boolify(raw)
+            required = False          # env‑var satisfies the requirement
+
+        super().__init__(
+            option_strings=option_strings,
+            dest=dest,
+            default=default,
+            required=required,
+            **kwargs,
+        )
+
+    # ------------------------------------------------------------------
+    # Helper: turn common textual booleans into real bools.
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _maybe_boolify(value: str) -> Any:
+        """Return a proper bool if the string looks like one, else the original."""
+        lowered = value.lower()
+        if lowered in _TRUE:
+            return True
+        if lowered in _FALSE:
+            return False
+        return value
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        setattr(namespace, self.dest, values)
\ No newline at end of file
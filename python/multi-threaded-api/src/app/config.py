@@ -1,5 +1,7 @@
 import logging
-import json
+import logging.handlers
+import threading
+import orjson
 
 class JsonLogFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
@@ -10,63 +12,121 @@ class JsonLogFormatter(logging.Formatter):
             "logger": record.name,
             "msg": record.getMessage(),
         }
-        # Unpack the tuple – guard against malformed records
-        try:
-            client_addr, method, path, http_version, status_code = record.args
-        except Exception:  # fallback – keep whatever we have
-            client_addr = method = path = http_version = status_code = None
+        # uvicorn access records carry (client_addr, method, path, http_version, status_code)
+        args = record.args
+        if isinstance(args, tuple) and len(args) == 5:
+            client_addr, method, path, http_version, status_code = args
 
-        # Add extra fields if they exist and replace the msg field
-        if method is not None and path is not None:
-            payload["msg"] = f"{method} {path}"
-        if status_code is not None:
-            payload["status_code"] = status_code
-        if client_addr is not None:
-            payload["client_addr"] = client_addr
-        if http_version is not None:
-            payload["http_version"] = f"HTTP/{http_version}"
+            # Add extra fields if they exist and replace the msg field
+            if method is not None and path is not None:
+                payload["msg"] = f"{method} {path}"
+            if status_code is not None:
+                payload["status_code"] = status_code
+            if client_addr is not None:
+                payload["client_addr"] = client_addr
+            if http_version is not None:
+                payload["http_version"] = f"HTTP/{http_version}"
+
+        # orjson writes UTF-8 as-is (like ensure_ascii=False); str() anything it can't encode
+        return orjson.dumps(payload, default=str).decode()
+
+class BufferedStreamHandler(logging.handlers.MemoryHandler):
+    """
+    Buffers records and writes them to the target StreamHandler in batches: when `capacity`
+    records are queued, when a record at `flushLevel` or above arrives, or every `interval` seconds.
+    Records are formatted as they are emitted, so later changes to their args don't show up.
+    close() (logging.shutdown() at exit, dictConfig when it replaces the handler) flushes it and
+    stops its flusher thread.
+    """
+    def __init__(self, capacity: int = 100, flushLevel: int = logging.WARNING,
+                 target: logging.Handler | None = None, interval: float = 1.0) -> None:
+        super().__init__(capacity, flushLevel=flushLevel, target=target, flushOnClose=True)
+        self.interval = interval
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, name="log-flusher", daemon=True)
+        self._flusher.start()
+
+    def _flush_periodically(self) -> None:
+        while not self._closed.wait(self.interval):
+            # skip the tick rather than wait: close() joins this thread while holding the lock
+            if self.lock.acquire(blocking=False):
+                try:
+                    self.flush()
+                finally:
+                    self.lock.release()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        target = self.target
+        if isinstance(target, logging.StreamHandler):
+            if record.levelno < target.level or not target.filter(record):
+                return
+            record.rendered = target.format(record) + target.terminator
+        super().emit(record)
+
+    def flush(self) -> None:
+        with self.lock:
+            if not self.buffer or self.target is None:
+                return
+            if not isinstance(self.target, logging.StreamHandler):
+                super().flush()
+                return
+            # hand the whole batch to the stream in one write
+            target = self.target
+            blob = "".join(getattr(record, "rendered", None) or target.format(record) + target.terminator
+                           for record in self.buffer)
+            self.buffer.clear()
+            with target.lock:
+                target.stream.write(blob)
+                target.flush()
+
+    def close(self) -> None:
+        self._closed.set()
+        if self._flusher is not threading.current_thread():
+            self._flusher.join()
+        super().close()
+
+
+# Formatters are stateless, so they are built once here and shared by every logging configuration
+LOG_FORMATTERS = {
+    "minimal": logging.Formatter(fmt="%(levelname)-8s: %(message)s", datefmt="%Y-%m-%d %H:%M:%S"),
+    "default": logging.Formatter(fmt="%(asctime)s - %(levelname)-8s: %(message)s", datefmt="%Y-%m-%d %H:%M:%S"),
+    "debug": logging.Formatter(fmt="%(levelname)-8s: %(name)s (%(module)s:%(lineno)d): %(message)s",
+                               datefmt="%Y-%m-%d %H:%M:%S"),
+    "json": JsonLogFormatter(datefmt="%Y-%m-%d %H:%M:%S"),
+}
+
+
+def shared_formatter(name: str) -> logging.Formatter:
+    """ dictConfig formatter factory returning the prebuilt formatter """
+    return LOG_FORMATTERS[name]
 
-        return json.dumps(payload, ensure_ascii=False)
 
 LOGGING_CONFIG = {
     "version": 1,
     "disable_existing_loggers": False,
-    "formatters": {
-        "minimal": {
-            "format": "%(levelname)-8s: %(message)s",
-            "datefmt": "%Y-%m-%d %H:%M:%S",
-            "use_colors": False,
-        },
-        "default": {
-            "format": "%(asctime)s - %(levelname)-8s: %(message)s",
-            "datefmt": "%Y-%m-%d %H:%M:%S",
-            "use_colors": False,
-        },
-        "debug": {
-            "format": "%(levelname)-8s: %(name)s (%(module)s:%(lineno)d): %(message)s",
-            "datefmt": "%Y-%m-%d %H:%M:%S",
-            "use_colors": False,
-        },
-        "json": {
-            "()": JsonLogFormatter,
-            "datefmt": "%Y-%m-%d %H:%M:%S",
-        },
-    },
+    "formatters": {name: {"()": shared_formatter, "name": name} for name in LOG_FORMATTERS},
     "handlers": {
         "default": {
             "class": "logging.StreamHandler",
             "formatter": "default",
             "level": "INFO",
         },
+        "buffered": {
+            "class": f"{__name__}.BufferedStreamHandler",
+            "target": "default",
+            "capacity": 100,
+            "flushLevel": logging.WARNING,
+            "interval": 1.0,
+        },
     },
     "loggers": {
-        "api": {"handlers": ["default"], "level": "INFO", "propagate": False },
-        "uvicorn": {"handlers": ["default"], "level": "INFO", "propagate": False },
-        "uvicorn.error": {"handlers": ["default"], "level": "INFO", "propagate": False},
-        "uvicorn.access": {"handlers": ["default"], "level": "INFO", "propagate": False},
+        "api": {"handlers": ["buffered"], "level": "INFO", "propagate": False },
+        "uvicorn": {"handlers": ["buffered"], "level": "INFO", "propagate": False },
+        "uvicorn.error": {"handlers": ["buffered"], "level": "INFO", "propagate": False},
+        "uvicorn.access": {"handlers": ["buffered"], "level": "INFO", "propagate": False},
     },
     "root": {
         "level": "INFO",
-        "handlers": ["default"],
+        "handlers": ["buffered"],
     },
 }
\ No newline at end of file
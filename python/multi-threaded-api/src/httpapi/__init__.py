@@ -1,17 +1,37 @@
 import os
+import asyncio
 import threading
-import signal
-import sys
-import json
+import ssl
+import orjson
 import logging
 import uvicorn
+from dataclasses import asdict
+import anyio.to_thread
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends, Request, HTTPException
 from fastapi.staticfiles import StaticFiles
 from fastapi.openapi.docs import get_swagger_ui_html
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 from .apiroutes import router
-from typing import Optional, List, Tuple
-from .helpers import verify_sha256
+from typing import Optional
+from .helpers import verify_sha256, sha256_hw_accelerated
+
+_logger = logging.getLogger("uvicorn")
+# OpenAPI schemas keyed by the (frozen) api_config and meta they were generated for
+_openapi_schemas: dict[tuple, dict] = {}
+
+
+class _NotifyingServer(uvicorn.Server):
+    """ uvicorn.Server that sets a threading.Event once its sockets are bound """
+
+    def __init__(self, config: uvicorn.Config, started: threading.Event):
+        super().__init__(config)
+        self._started_event = started
+
+    async def startup(self, sockets=None) -> None:
+        await super().startup(sockets=sockets)
+        self._started_event.set()
 
 
 class FastAPIThreadedServer():
@@ -25,100 +45,176 @@ class FastAPIThreadedServer():
         uvc_config: Optional[object] = None,
         api_config: Optional[object] = None,
         meta: Optional[object] = None,
+        task_workers: int = 1,
+        cpu_workers: int = 1,
     ):
         self.uvc_config = uvc_config
         self.api_config = api_config
         self.logger_config = logger_config
         self.meta = meta
-        self._logger = logging.getLogger("uvicorn")
+        self._logger = _logger
         self._logger.info("Initializing FastAPIThreadedServer instance.")
+        if sha256_hw_accelerated() is False:
+            self._logger.warning("CPU does not advertise SHA-256 instructions (sha_ni/sha2); "
+                                 "x-payload-sha256 checks will use the slower scalar implementation.")
+        else:
+            self._logger.debug(f"Payload SHA-256 checks use {ssl.OPENSSL_VERSION}")
 
-        # ------------------------------------------------------------------
-        # Build the FastAPI instance and register routes
-        # ------------------------------------------------------------------
-        self.app = FastAPI(
-            docs_url=None,
-            dependencies=[Depends(self.before_handler)],
-            **self.api_config.__dict__
-
+        # Build the FastAPI instance with its routes registered
+        self.app = self.create_app(
+            api_config=self.api_config,
+            meta=self.meta,
+            thread_pool_size=self.uvc_config.thread_pool_size,
+            logger_name=getattr(self.logger_config, 'name', None) or __name__,
+            task_workers=task_workers,
+            cpu_workers=cpu_workers,
         )
-        # register static files
-        print(f"Mounting static files from: {self.meta.static_dir}")
-        self.app.mount("/static", StaticFiles(directory=f"{self.meta.static_dir}"), name="static")
-        # register built-in routes
-        self._register_builtin_routes()
-        # import external routers:
-        router.logger_name = self.logger_config.name if self.logger_config and hasattr(self.logger_config, 'name') else __name__
-        self.app.include_router(router)
 
         # Thread control
         self._server_thread: Optional[threading.Thread] = None
         self._should_stop = threading.Event()
+        self._started = threading.Event()
+
+    @classmethod
+    def create_app(cls, api_config, meta, thread_pool_size: int, logger_name: str, task_workers: int = 1,
+                   cpu_workers: int = 1, pin_cores: bool = True) -> FastAPI:
+        """
+        Build a FastAPI instance and register routes. Every server gets its own app (and its own
+        task handler); only the OpenAPI schema is shared, since the frozen configs determine it,
+        so a server rebuilt with the same settings (restarts, tests) skips generating it again.
+        """
+        app = FastAPI(
+            docs_url=None,
+            redoc_url=None,
+            lifespan=cls._lifespan_factory(thread_pool_size),
+            dependencies=[Depends(cls.before_handler)],
+            default_response_class=ORJSONResponse,
+            **asdict(api_config)
+        )
+        # register static files
+        _logger.debug(f"Mounting static files from: {meta.static_dir}")
+        app.mount("/static", StaticFiles(directory=f"{meta.static_dir}"), name="static")
+        # register built-in routes
+        cls._register_builtin_routes(app, meta)
+        # import external routers; their lifespan reads its settings from the app state
+        app.state.logger_name = logger_name
+        app.state.task_workers = task_workers
+        app.state.cpu_workers = cpu_workers
+        app.state.pin_cores = pin_cores
+        app.include_router(router)
+        if app.openapi_url is not None:
+            # build the schema now so the first /docs hit doesn't pay for it
+            schema_key = (api_config, meta)
+            if schema_key not in _openapi_schemas:
+                _openapi_schemas[schema_key] = app.openapi()
+            app.openapi_schema = _openapi_schemas[schema_key]
+        return app
+
+    @staticmethod
+    def _lifespan_factory(pool_size: int):
+        @asynccontextmanager
+        async def _lifespan(app: FastAPI):
+            """Size the thread pools used for blocking work before serving requests."""
+            # asyncio.to_thread / loop.run_in_executor
+            asyncio.get_running_loop().set_default_executor(
+                ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="fastapi-sync")
+            )
+            # FastAPI runs sync (`def`) routes and dependencies on the anyio thread pool
+            anyio.to_thread.current_default_thread_limiter().total_tokens = pool_size
+            _logger.debug(f"Thread pool size for blocking work set to {pool_size}")
+            yield
+        return _lifespan
 
     # ----------------------------------------------------------------------
     # Public API
     # ----------------------------------------------------------------------
-    async def before_handler(self, request: Request):
+    @staticmethod
+    async def before_handler(request: Request):
         # Fetch the route name
         route = request.scope.get("route", None)
         route_name = route.name if route else "unknown"
-        self._logger.debug(f"Handling request for route: {route_name}")
+        _logger.debug(f"Handling request for route: {route_name}")
         
         # Try reading JSON safely
         if request.method not in ("POST", "PUT", "PATCH"):
             return  route_name # only validate bodies for these methods
 
-        data = {}
+        body = await request.body()
         try:
-            data = await request.json()
-        except json.JSONDecodeError:
+            # parsed once here; handlers reuse request.state.json instead of parsing again
+            request.state.json = orjson.loads(body)
+        except orjson.JSONDecodeError:
             raise HTTPException(
                 status_code=400,
                 detail="Invalid JSON in request body"
             )
 
-        # Verify SHA256 header if present
-        if "x_payload_sha256" in request.headers:
-            sha256_header = request.headers["x_payload_sha256"]
-            if not verify_sha256(data=json.dumps(data), expected_hash=sha256_header):
-                raise HTTPException(
-                    status_code=400,
-                    detail="SHA256 hash mismatch for request body"
-                )
+        # Verify SHA256 header if present: hash the bytes exactly as received
+        sha256_header = request.headers.get("x-payload-sha256")
+        if sha256_header is not None and not verify_sha256(data=body, expected_hash=sha256_header):
+            raise HTTPException(
+                status_code=400,
+                detail="SHA256 hash mismatch for request body"
+            )
 
         return route_name
         
-    def start(self) -> None:
-        """Launch uvicorn in a daemon thread."""
+    def start(self, timeout: float = 5.0) -> None:
+        """Launch uvicorn in a daemon thread and return once it is accepting connections."""
         if self._server_thread and self._server_thread.is_alive():
             raise RuntimeError("Server already running")
 
+        # The threaded path is single-process by design: Server.run() ignores `workers`,
+        # so say so instead of silently serving with one process. Use start_multiprocess() instead.
+        options = self.uvc_config.uvicorn_options()
+        if options["workers"] > 1:
+            self._logger.warning(f"{options['workers']} workers requested, but the threaded server runs a "
+                                 "single uvicorn process; use start_multiprocess() for more.")
+            options["workers"] = 1
+
         # Build uvicorn config – we pass a custom `lifespan` hook that
         # watches the `_should_stop` event.
         config = uvicorn.Config(
             app=self.app,
             log_config=None, # we set up logging ourselves
-            **self.uvc_config.__dict__
+            **options
         )
-        self.server = uvicorn.Server(config)
+        self._started.clear()
+        self.server = _NotifyingServer(config, started=self._started)
 
         # Wrap the server.run() call in a thread target.
         def _run():
-            # uvicorn.Server.run() blocks until `self.should_exit` becomes True.
-            # We forward our own stop flag.
-            while not self._should_stop.is_set():
-                # `run` returns only when the server shuts down; we invoke it once.
-                # The loop exists solely to allow us to break early via the event.
-                self.server.run()
-                break
+            try:
+                # uvicorn.Server.run() blocks until `self.should_exit` becomes True.
+                # We forward our own stop flag.
+                while not self._should_stop.is_set():
+                    # `run` returns only when the server shuts down; we invoke it once.
+                    # The loop exists solely to allow us to break early via the event.
+                    self.server.run()
+                    break
+            finally:
+                # wake start() if uvicorn exits (e.g. bind failure) before it is listening
+                self._started.set()
 
         self._server_thread = threading.Thread(target=_run, daemon=True, name="uvicorn-thread")
         self._server_thread.start()
 
-        # Small pause to give uvicorn a chance to bind the socket.
-        # In production you’d poll `self.server.started` or similar.
-        import time
-        time.sleep(0.1)
+        # Block until uvicorn is listening (or gave up)
+        if not self._started.wait(timeout=timeout) or not self.server.started:
+            raise RuntimeError("uvicorn did not start")
+
+    def start_multiprocess(self) -> None:
+        """
+        Run uvicorn in the foreground with `uvc_config.workers` worker processes.
+        Blocks until shutdown; uvicorn's supervisor handles the signals. Each worker
+        imports `app_factory` and builds its own app from the same arguments.
+        """
+        uvicorn.run(
+            f"{__name__}:app_factory",
+            factory=True,
+            log_config=None, # we set up logging ourselves
+            **self.uvc_config.uvicorn_options()
+        )
 
     def stop(self, timeout: float = 5.0) -> None:
         """Signal uvicorn to shut down and wait for the thread to finish."""
@@ -140,35 +236,45 @@ class FastAPIThreadedServer():
     # ----------------------------------------------------------------------
     # Default methods (routes)
     # ----------------------------------------------------------------------
-    def _register_builtin_routes(self) -> None:
+    @staticmethod
+    def _register_builtin_routes(app: FastAPI, meta) -> None:
         """Add a few default endpoints (health, version, etc.)."""
 
-        @self.app.get("/favicon.ico", include_in_schema=False)
+        favicon_path = os.path.join(meta.static_dir, "favicon.ico")
+
+        @app.get("/favicon.ico", include_in_schema=False)
         async def favicon():
-            return FileResponse(os.path.join(self.meta.static_dir, "favicon.ico"), 
-            media_type="image/vnd.microsoft.icon")
-
-        @self.app.get("/docs", include_in_schema=False)
-        async def custom_swagger_ui():
-            return get_swagger_ui_html(
-                openapi_url=self.app.openapi_url,
-                title=self.app.title + " - Swagger UI",
-                swagger_css_url="/static/swagger-dark.css",
-                swagger_favicon_url="/static/favicon.ico",
-                swagger_ui_parameters={"syntaxHighlight": {"theme": "obsidian"}}
-            )
+            return FileResponse(favicon_path, media_type="image/vnd.microsoft.icon")
+
+        # the Swagger UI needs the schema; skip it when OpenAPI is disabled
+        if app.openapi_url is not None:
+            @app.get("/docs", include_in_schema=False)
+            async def custom_swagger_ui():
+                return get_swagger_ui_html(
+                    openapi_url=app.openapi_url,
+                    title=app.title + " - Swagger UI",
+                    swagger_css_url="/static/swagger-dark.css",
+                    swagger_favicon_url="/static/favicon.ico",
+                    swagger_ui_parameters={"syntaxHighlight": {"theme": "obsidian"}}
+                )
 
-        @self.app.get("/ping", name="ping", tags=["health"])
+        # These responses are constant for the life of the process, so build them once:
+        # Response objects hold their pre-rendered body and headers and can be sent repeatedly
+        ping_response = ORJSONResponse({meta.name: "pong"})
+        health_response = ORJSONResponse({"status": "ok"})
+        version_response = ORJSONResponse({"name": meta.name, "version": meta.version, "copyright": meta.copyright})
+
+        @app.get("/ping", name="ping", tags=["health"])
         async def ping():
-            return {f"{self.meta.name}": "pong"}
+            return ping_response
 
-        @self.app.get("/healthz", tags=["health"])
+        @app.get("/healthz", tags=["health"])
         async def health():
-            return {"status": "ok"}
+            return health_response
 
-        @self.app.get("/version", tags=["health"])
+        @app.get("/version", tags=["health"])
         async def version():
-            return {"name": f"{self.meta.name}", "version": f"{self.meta.version}", "copyright": f"{self.meta.copyright}"}
+            return version_response
 
     # ----------------------------------------------------------------------
     # Convenience dunder methods
@@ -180,4 +286,20 @@ class FastAPIThreadedServer():
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Automatic shutdown when leaving the context."""
-        self.stop()
\ No newline at end of file
+        self.stop()
+
+
+def app_factory() -> FastAPI:
+    """ Build the FastAPI app in a uvicorn worker process (see start_multiprocess) """
+    from app import App
+    app = App()
+    return FastAPIThreadedServer.create_app(
+        api_config=app.api_config,
+        meta=app.meta,
+        thread_pool_size=app.uvc_config.thread_pool_size,
+        logger_name=app.logger_config.name,
+        task_workers=app.task_workers,
+        cpu_workers=app.cpu_cores,
+        # every worker process has its own @cpu_bound pool; pinning them all to the same cores would stack them
+        pin_cores=app.uvc_config.workers == 1,
+    )
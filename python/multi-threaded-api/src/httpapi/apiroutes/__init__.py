@@ -1,28 +1,32 @@
-import json
+import orjson
 import logging
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, APIRouter, Depends, Request, Response, HTTPException, Header, middleware
-from .handler import Handler, STATUS_PENDING, STATUS_READY, STATUS_FAILED, STATUS_COMPLETED
-
-logger = None
-handler = Handler(name="route-handler", interval=1.0)
+from typing import Iterator
+from itertools import islice
+from uuid import UUID
+from fastapi import FastAPI, APIRouter, Request, Response, HTTPException
+from fastapi.responses import StreamingResponse
+from .handler import Handler, STATUS_PENDING, STATUS_READY
+from .handler.tasks import TaskProcessor
 
 @asynccontextmanager
 async def router_lifespan(app: FastAPI):
-    """Lifespan context manager for the router."""
+    """Lifespan context manager for the router. The handler lives on the app state, one per app."""
     # create and start the handler
-    logger = logging.getLogger(router.logger_name if hasattr(router, 'logger_name') else __name__)
+    logger = logging.getLogger(getattr(app.state, 'logger_name', __name__))
     logger.debug(f"Initializing the API router.")
     
-    handler.start()
-    logger.info(f"Started queue handler '{handler.name}' with ID '{handler.id}'")
+    handler = app.state.handler = Handler(name="route-handler")
+    handler.start(num_workers=getattr(app.state, 'task_workers', 1), cpu_workers=getattr(app.state, 'cpu_workers', 1),
+                  pin_cores=getattr(app.state, 'pin_cores', True))
+    logger.info(f"Started queue handler '{handler.name}' with ID '{handler.id}' and {len(handler.consumers)} worker(s)")
 
     yield
     # Shut down the handler
     logger.debug(f"Closing down the router and stopping the '{handler.name}' handler with ID '{handler.id}'.")
-    handler.stop()
-    handler.join(timeout=5.0)
+    await handler.stop()
     logger.debug(f"Handler '{handler.name}' stopped")
+    app.state.handler = None
 
 
 router = APIRouter(lifespan=router_lifespan)
@@ -35,29 +39,69 @@ async def poop(request: Request):
 @router.put("/task/queue", name="put_task_queue", tags=["tasks"])
 async def enqueue_task(request: Request):
     """
-    Enqueue a task to be processed by the handler.
+    Enqueue a task to be processed by the handler; the route name selects the TaskProcessor method.
     Returns a transaction ID for tracking. and a 202 Accepted status.
     
     """
-    payload = await request.json()
-    transaction_id = handler.put_task_queue(route_name=request.scope['route'].name, payload=payload)
+    return _enqueue(request, await _request_json(request))
+
+@router.put("/task/queue/primes", name="count_primes", tags=["tasks"])
+async def enqueue_count_primes(request: Request):
+    """
+    Enqueue a CPU-bound task counting the primes below `limit` (default 100000, at most 1000000).
+    Returns a transaction ID for tracking and a 202 Accepted status, or 422 for an invalid limit.
+    """
+    payload = await _request_json(request)
+    limit = payload.get("limit", TaskProcessor.PRIMES_LIMIT_DEFAULT) if isinstance(payload, dict) else None
+    if type(limit) is not int or not 2 <= limit <= TaskProcessor.PRIMES_LIMIT_MAX:
+        raise HTTPException(status_code=422,
+                            detail=f"limit must be an integer between 2 and {TaskProcessor.PRIMES_LIMIT_MAX}")
+    return _enqueue(request, payload)
+
+
+async def _request_json(request: Request):
+    # before_handler has already parsed the body; only parse here if it didn't run
+    payload = getattr(request.state, "json", None)
+    if payload is None:
+        payload = await request.json()
+    return payload
+
+def _enqueue(request: Request, payload) -> Response:
+    transaction_id = request.app.state.handler.put_task_queue(route_name=request.scope['route'].name, payload=payload)
     return Response(
         status_code=202, 
-        content=json.dumps({"transaction_id": transaction_id}),
+        content=orjson.dumps({"transaction_id": transaction_id}),
         media_type="application/json"
     )
 
 
+# The response queue lookups below are short in-memory dict operations,
+# so they run directly on the event loop.
 @router.get("/task/queue/all", name="get_task_queue_all", tags=["tasks"])
 async def task_queue_all(request: Request):
     """Get all tasks in the response queue."""
-    tasks = handler.get_response_queue()
-    return {"tasks": tasks}
+    return StreamingResponse(_encode_tasks(request.app.state.handler.iter_response_queue()), media_type="application/json")
+
+
+def _encode_tasks(tasks: Iterator[dict], batch_size: int = 256) -> Iterator[bytes]:
+    """Encode tasks as a {"tasks": [...]} document, one chunk per batch of rows."""
+    yield b'{"tasks":['
+    separator = b""
+    for batch in iter(lambda: list(islice(tasks, batch_size)), []):
+        yield separator + b",".join(orjson.dumps(task) for task in batch)
+        separator = b","
+    yield b"]}"
 
 @router.get("/task/queue/{transaction_id}", name="get_task_queue_task", tags=["tasks"])
 async def task_queue_status(transaction_id: str, request: Request):
     """Get the status of a specific task in the response queue."""
-    task = handler.get_task_status(transaction_id=transaction_id)
+    try:
+        # tasks are keyed by the raw UUID bytes; accepts both hex and dashed forms
+        task_key = UUID(transaction_id).bytes
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Task not found")
+    handler = request.app.state.handler
+    task = handler.get_task_status(transaction_id=task_key)
     if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
 
@@ -65,7 +109,7 @@ async def task_queue_status(transaction_id: str, request: Request):
         raise HTTPException(status_code=202, detail=f"transaction_id: {transaction_id} is {task['status']}")
 
     if "status" in task and task["status"] == STATUS_READY:
-        handler.set_task_done(transaction_id=transaction_id)
+        handler.set_task_done(transaction_id=task_key)
     
     return task
 
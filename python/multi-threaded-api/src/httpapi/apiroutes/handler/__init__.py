@@ -1,14 +1,12 @@
 import os
-import pickle
-import queue
-import sqlite3
-import json
-from uuid import uuid4, UUID
+import signal
+import asyncio
+import multiprocessing
+from uuid import uuid4
 import threading
-import logging
-from time import sleep
-from concurrent.futures import ProcessPoolExecutor
-from typing import Optional, Any
+from time import monotonic
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Optional, Any, Iterator
 from .tasks import TaskProcessor
 
 STATUS_PENDING = "pending"
@@ -16,134 +14,218 @@ STATUS_READY = "ready"
 STATUS_COMPLETED = "completed"
 STATUS_FAILED = "failed"
 
-class HandlerQueue(queue.Queue):
+def _init_pool_process(counter, cores: Optional[list[int]]) -> None:
     """
-    A simple threaded worker queue for processing tasks in the background.
+    Process pool initializer. Unblocks the shutdown signals the parent masks for its sigwait
+    thread (children inherit the mask), then pins this worker process to the next core in `cores`.
     """
-    def __init__(self, state_dir=None, maxsize: int = 0) -> None:
-        self.id = str(uuid4())
-        self.state_dir = os.path.join(state_dir, self.id) if state_dir else None
-        super().__init__(maxsize=maxsize)
+    if hasattr(signal, "pthread_sigmask"):
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, {signal.SIGINT, signal.SIGTERM})
+    if not cores:
+        return
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    try:
+        os.sched_setaffinity(0, {cores[index % len(cores)]})
+    except OSError:
+        # e.g. the core was removed from the cpuset since the pool was created
+        pass
+
 
 class ResponseQueue:
+    """
+    In-memory store for task status and results, shared by the API and handler threads.
+    Rows are plain dicts keyed by the transaction ID's 16 raw UUID bytes behind one lock. Completed tasks are kept
+    for COMPLETED_TTL seconds so their result can still be read, then evicted on a later write.
+    """
+    COMPLETED_TTL = 300.0
+
     def __init__(self):
-        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
-        self.lock = threading.Lock()
-        self._init_table()
-
-    def _init_table(self):
-        with self.lock:
-            self.conn.execute(f"""
-                CREATE TABLE queue (
-                    transaction_id TEXT PRIMARY KEY,
-                    route TEXT,
-                    payload BLOB,
-                    status TEXT DEFAULT {STATUS_PENDING}
-                )
-            """)
-            self.conn.commit()
+        self._rows: dict[bytes, dict] = {}
+        # transaction ID -> monotonic time after which the completed row is evicted
+        self._expires: dict[bytes, float] = {}
+        self._lock = threading.RLock()
+
+    def _evict_expired(self) -> None:
+        """ Drop completed rows whose TTL has passed. Caller holds the lock. """
+        if not self._expires:
+            return
+        now = monotonic()
+        for transaction_id in [tid for tid, expires in self._expires.items() if expires <= now]:
+            del self._expires[transaction_id]
+            self._rows.pop(transaction_id, None)
 
     def qsize(self) -> int:
-        with self.lock:
-            count = self.conn.execute("SELECT COUNT(*) FROM queue").fetchone()[0]
-            return count
-
-    def put(self, transaction_id: UUID, route: str, payload: Any = {}):
-        with self.lock:
-            if isinstance(payload, (dict, list, tuple)):
-                payload = json.dumps(payload)
-            self.conn.execute(
-                "INSERT INTO queue (transaction_id, route, payload) VALUES (?, ?, ?)",
-                (transaction_id, route, payload)
-            )
-            self.conn.commit()
+        return len(self._rows)
+
+    def put(self, transaction_id: bytes, route: str, payload: Any = {}):
+        self.upsert(transaction_id, route, payload, STATUS_PENDING)
+
+    def upsert(self, transaction_id: bytes, route: str, payload: Any, status: str) -> None:
+        """ Insert the task with the given status, or replace its payload and status if it exists """
+        with self._lock:
+            row = self._rows.get(transaction_id)
+            if row is not None:
+                row["payload"] = payload
+                row["status"] = status
+                return
+            self._evict_expired()
+            self._rows[transaction_id] = {
+                "transaction_id": transaction_id.hex(),
+                "route": route,
+                "payload": payload,
+                "status": status,
+            }
     
-    def update_status(self, transaction_id: UUID, status: str, payload: Any = {}) -> None:
-        with self.lock:
-            self.conn.execute(
-                "UPDATE queue SET payload = ?, status = ? WHERE transaction_id = ?",
-                (json.dumps(payload), status, transaction_id)
-            )
-            self.conn.commit()
+    def update_status(self, transaction_id: bytes, status: str, payload: Any = {}) -> None:
+        with self._lock:
+            row = self._rows.get(transaction_id)
+            if row is not None:
+                row["payload"] = payload
+                row["status"] = status
     
-    def get_task(self, transaction_id: UUID) -> Optional[dict]:
-        with self.lock:
-            cursor = self.conn.execute(
-                "SELECT transaction_id, payload, status FROM queue WHERE transaction_id = ?",
-                (transaction_id,)
-            )
-            row = cursor.fetchone()
-            if not row:
+    def get_task(self, transaction_id: bytes) -> Optional[dict]:
+        with self._lock:
+            row = self._rows.get(transaction_id)
+            if row is None:
                 return None
-            if row and "payload" in row.keys():
-                try:
-                    payload = json.loads(row["payload"])
-                    row = dict(row)
-                    row["payload"] = payload
-                except (json.JSONDecodeError, TypeError):
-                    pass
-                return dict(row)
-
-    def task_done(self, transaction_id: UUID, purge: bool = False) -> None:
-        with self.lock:
+            return {"transaction_id": row["transaction_id"], "payload": row["payload"], "status": row["status"]}
+
+    def task_done(self, transaction_id: bytes, purge: bool = False) -> None:
+        with self._lock:
             if purge:
-                self.conn.execute(
-                    "DELETE FROM queue WHERE transaction_id = ?",
-                    (transaction_id,)
-                )
-            else:
-                self.conn.execute(
-                    "UPDATE queue SET status = ? WHERE transaction_id = ?",
-                    (STATUS_COMPLETED, transaction_id)
-                )
-            self.conn.commit()
+                self._rows.pop(transaction_id, None)
+                self._expires.pop(transaction_id, None)
+                return
+            row = self._rows.get(transaction_id)
+            if row is not None:
+                row["status"] = STATUS_COMPLETED
+                self._expires[transaction_id] = monotonic() + self.COMPLETED_TTL
     
     def dump(self) -> list[dict]:
-        with self.lock:
-            cursor = self.conn.execute("SELECT * FROM queue")
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
+        with self._lock:
+            return [dict(row) for row in self._rows.values()]
+
+    def iterdump(self) -> Iterator[dict]:
+        """ Yield the rows without copying them; the lock is only held to snapshot the row references """
+        with self._lock:
+            rows = list(self._rows.values())
+        yield from rows
 
-class Handler(threading.Thread):
+class Handler:
     """
-    A worker that processes tasks from a WorkerQueue.
+    Processes queued tasks with a set of asyncio consumers sharing one asyncio.Queue.
+    Consumers are created on startup and wait on the queue, so a task is picked up as soon
+    as it is queued; the blocking task work runs on a thread pool owned by the handler.
+    Task methods marked @gil_released get a second thread pool sized to the CPU cores.
+    Task methods marked @cpu_bound run on a process pool instead, so they aren't serialized
+    by the GIL. Its processes are started with forkserver (spawn where that is unavailable):
+    forking this multi-threaded process could copy a lock held by another thread.
     """
-    def __init__(self, name: str, interval: float = 1.0) -> None:
-        self.id = str(uuid4())
-        self.iqueue = HandlerQueue()
+    def __init__(self, name: str) -> None:
+        self.id = uuid4().hex
+        self.name = name
         self.rqueue = ResponseQueue()
-        super().__init__(name=name)
-        self.interval = interval
-        self._stop_event = threading.Event()
-
-    def run(self) -> None:
-        while not self._stop_event.is_set():
-            try:
-                task = self.iqueue.get(timeout=self.interval)
-                self.process_queue_task(task)
-                self.iqueue.task_done()
-            except queue.Empty:
-                continue
-
-    def stop(self) -> None:
-      self._stop_event.set()
+        self.iqueue: Optional[asyncio.Queue] = None
+        self.consumers: list[asyncio.Task] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._gil_executor: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self.cpu_workers = 1
+        self.pin_cores = True
+
+    def start(self, num_workers: int = 1, cpu_workers: Optional[int] = None, pin_cores: bool = True) -> None:
+        """
+        Create the task queue and its consumers. Must be called from the running event loop.
+        Set pin_cores=False when other processes (e.g. uvicorn workers) run their own pools.
+        """
+        num_workers = max(1, num_workers)
+        if cpu_workers:
+            self.cpu_workers = cpu_workers
+        self.pin_cores = pin_cores
+        self.iqueue = asyncio.Queue()
+        # created before the task threads; its worker processes only start when a @cpu_bound task is submitted
+        self._process_pool = self._create_process_pool()
+        # one long-lived pool for the task work; each consumer runs one task at a time
+        self._executor = ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix=f"{self.name}-task")
+        # C code that releases the GIL runs in parallel, so one thread per core keeps the cores busy
+        self._gil_executor = ThreadPoolExecutor(max_workers=self.cpu_workers, thread_name_prefix=f"{self.name}-gil")
+        self.consumers = [
+            asyncio.create_task(self._consume(), name=f"{self.name}-{i}")
+            for i in range(num_workers)
+        ]
+
+    def _create_process_pool(self) -> ProcessPoolExecutor:
+        """
+        Pool for @cpu_bound tasks. With pin_cores each process is pinned to its own core so it keeps
+        a warm cache; otherwise the kernel schedules them.
+        """
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        cores = sorted(os.sched_getaffinity(0)) if self.pin_cores and hasattr(os, "sched_setaffinity") else None
+        return ProcessPoolExecutor(max_workers=self.cpu_workers, mp_context=context, initializer=_init_pool_process,
+                                   initargs=(context.Value("i", 0), cores))
+
+    async def stop(self) -> None:
+        for consumer in self.consumers:
+            consumer.cancel()
+        await asyncio.gather(*self.consumers, return_exceptions=True)
+        self.consumers = []
+        for executor in (self._executor, self._gil_executor):
+            if executor is not None:
+                # don't hold up shutdown for tasks already running
+                executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._gil_executor = None
+        if self._process_pool is not None:
+            # shutdown() can't interrupt a running call, and the concurrent.futures exit hook
+            # would wait for it, so end the live worker processes as well
+            processes = list((self._process_pool._processes or {}).values())
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            for process in processes:
+                process.terminate()
+            self._process_pool = None
+
+    async def _consume(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            task = await self.iqueue.get()
+            method = getattr(TaskProcessor, task[1], None)
+            if getattr(method, "cpu_bound", False):
+                await self._process_cpu_task(loop, task)
+            else:
+                executor = self._gil_executor if getattr(method, "gil_released", False) else self._executor
+                await loop.run_in_executor(executor, self.process_queue_task, task)
+
+    async def _process_cpu_task(self, loop: asyncio.AbstractEventLoop, task) -> None:
+        """ Run a @cpu_bound task method in a worker process """
+        transaction_id, route, payload = task
+        self.rqueue.put(transaction_id, route, payload)
+        try:
+            result = await loop.run_in_executor(self._process_pool, getattr(TaskProcessor, route), payload)
+            self.rqueue.update_status(transaction_id, payload=result, status=STATUS_READY)
+        except Exception as e:
+            self.rqueue.update_status(transaction_id, payload={"error": str(e)}, status=STATUS_FAILED)
 
     def qsize(self) -> int:
-        return self.iqueue.qsize()
+        return self.iqueue.qsize() if self.iqueue is not None else 0
 
-    def put_task_queue(self, route_name, payload) -> UUID:
-        transaction_id = str(uuid4())
-        self.iqueue.put((transaction_id, route_name, payload))
-        return transaction_id
+    def put_task_queue(self, route_name, payload) -> str:
+        """ Queue a task and return its transaction ID (hex) for the client """
+        transaction_id = uuid4().bytes
+        self.iqueue.put_nowait((transaction_id, route_name, payload))
+        return transaction_id.hex()
 
     def get_response_queue(self) -> list[dict]:
         return self.rqueue.dump()
 
-    def get_task_status(self, transaction_id: UUID) -> Optional[dict]:
+    def iter_response_queue(self) -> Iterator[dict]:
+        return self.rqueue.iterdump()
+
+    def get_task_status(self, transaction_id: bytes) -> Optional[dict]:
         return self.rqueue.get_task(transaction_id)
 
-    def set_task_done(self, transaction_id: UUID, purge: bool = False) -> None:
+    def set_task_done(self, transaction_id: bytes, purge: bool = False) -> None:
         self.rqueue.task_done(transaction_id, purge=purge)
 
     # Function to handle individual tasks that are not queued
@@ -153,18 +235,14 @@ class Handler(threading.Thread):
     # Function to handle queued tasks
     def process_queue_task(self, task) -> None:
         transaction_id, route, payload = task
-        self.rqueue.put(transaction_id, route, payload)
-
-        processor = TaskProcessor(transaction_id=transaction_id)
+        processor = TaskProcessor(transaction_id=transaction_id.hex())
         if not hasattr(processor, f"{route}"):
-            self.rqueue.update_status(transaction_id, payload={"error": f"Unknown route: {route}"}, status=STATUS_FAILED)
+            # the outcome is already known, so record it in one write
+            self.rqueue.upsert(transaction_id, route, {"error": f"Unknown route: {route}"}, STATUS_FAILED)
             return
-        with ProcessPoolExecutor() as executor:
-            future = executor.submit(getattr(processor, f"{route}"), payload)
-            try:
-                result = future.result()
-                self.rqueue.update_status(transaction_id, payload=result, status=STATUS_READY)
-            except Exception as e:
-                self.rqueue.update_status(transaction_id, payload={"error": str(e)}, status=STATUS_FAILED)
-                return
-
+        self.rqueue.put(transaction_id, route, payload)
+        try:
+            result = getattr(processor, f"{route}")(payload)
+            self.rqueue.update_status(transaction_id, payload=result, status=STATUS_READY)
+        except Exception as e:
+            self.rqueue.update_status(transaction_id, payload={"error": str(e)}, status=STATUS_FAILED)
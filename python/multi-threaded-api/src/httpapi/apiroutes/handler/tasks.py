@@ -1,6 +1,41 @@
 from time import sleep
 
+
+def cpu_bound(func):
+    """
+    Mark a task method as CPU-bound so the handler runs it in a worker process instead of
+    a thread. Use it for pure-Python CPU work, which holds the GIL. Apply it under
+    @staticmethod; the payload and the result must be picklable.
+    """
+    if getattr(func, "gil_released", False):
+        raise TypeError(f"{func.__qualname__}: @cpu_bound and @gil_released can't be combined")
+    func.cpu_bound = True
+    return func
+
+
+def gil_released(func):
+    """
+    Mark a CPU-heavy task method whose work runs in C code that releases the GIL (numpy, Pillow,
+    hashlib on large buffers). The handler runs it on a thread pool sized to the CPU cores, where
+    such calls run in parallel without pickling. Python can't check that a call really drops the
+    GIL, so this is a contract of the method: pure-Python CPU work belongs under @cpu_bound.
+    """
+    if getattr(func, "cpu_bound", False):
+        raise TypeError(f"{func.__qualname__}: @cpu_bound and @gil_released can't be combined")
+    func.gil_released = True
+    return func
+
+
 class TaskProcessor:
+    """
+    Task implementations, one method per route name. Unmarked methods run on the handler's
+    task thread pool, which suits I/O. Mark C work that releases the GIL with @gil_released
+    and pure-Python CPU work with @cpu_bound.
+    """
+    # count_primes is O(n·√n): cap the limit so one request can't hold a core for hours
+    PRIMES_LIMIT_DEFAULT = 100_000
+    PRIMES_LIMIT_MAX = 1_000_000
+
     def __init__(self, transaction_id: str):
         self.transaction_id = transaction_id
 
@@ -8,4 +43,14 @@ class TaskProcessor:
     @staticmethod
     def put_task_queue(payload: dict):
         sleep(15.0)
-        return {"status": "task completed", "processor": "TaskProcessor"}
\ No newline at end of file
+        return {"status": "task completed", "processor": "TaskProcessor"}
+
+    @staticmethod
+    @cpu_bound
+    def count_primes(payload: dict):
+        """ Count the primes below payload["limit"]: pure-Python CPU work, so it runs in a worker process """
+        limit = int(payload.get("limit", TaskProcessor.PRIMES_LIMIT_DEFAULT))
+        if not 2 <= limit <= TaskProcessor.PRIMES_LIMIT_MAX:
+            raise ValueError(f"limit must be between 2 and {TaskProcessor.PRIMES_LIMIT_MAX}")
+        primes = sum(1 for n in range(2, limit) if all(n % d for d in range(2, int(n ** 0.5) + 1)))
+        return {"limit": limit, "primes": primes, "processor": "TaskProcessor"}
@@ -1,12 +1,24 @@
+import hmac
 import hashlib
+import functools
 
-def verify_sha256(data: str, expected_hash: str) -> bool:
-    """ Verify the SHA-256 hash of the given data. """
-    if isinstance(data, bytes):
-        data = data.decode()
-    if isinstance(data, dict) or isinstance(data, list):
-        data = json.dumps(data)
-    sha256 = hashlib.sha256()
-    sha256.update(data.encode())
-    computed_hash = sha256.hexdigest()
-    return computed_hash == expected_hash
\ No newline at end of file
+def verify_sha256(data: bytes, expected_hash: str) -> bool:
+    """ Verify the SHA-256 hash of the given raw bytes. """
+    computed_hash = hashlib.sha256(data).hexdigest()
+    # constant-time compare so the check doesn't leak how much of the hash matched
+    return hmac.compare_digest(computed_hash, expected_hash)
+
+@functools.cache
+def sha256_hw_accelerated() -> bool | None:
+    """
+    Whether the CPU advertises SHA-256 instructions (x86 'sha_ni', ARMv8 'sha2') that OpenSSL
+    uses for hashlib.sha256. Returns None when it can't be determined (no /proc/cpuinfo).
+    """
+    try:
+        with open("/proc/cpuinfo") as cpuinfo:
+            for line in cpuinfo:
+                if line.startswith(("flags", "Features")):
+                    return not {"sha_ni", "sha2"}.isdisjoint(line.split(":", 1)[1].split())
+    except OSError:
+        pass
+    return None
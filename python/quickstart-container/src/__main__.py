@@ -1,21 +1,40 @@
-import os
 import sys
 import signal
-import time
+import threading
 from app import App
 
+# Shutdown signals are blocked before any thread starts (new threads inherit the mask) and
+# taken synchronously by a dedicated sigwait thread, so no handler interrupts whichever thread
+# happens to be running. Platforms without pthread_sigmask (Windows) use a signal handler.
+SHUTDOWN_SIGNALS = {signal.SIGINT, signal.SIGTERM}
+if hasattr(signal, "pthread_sigmask"):
+    signal.pthread_sigmask(signal.SIG_BLOCK, SHUTDOWN_SIGNALS)
+
 # Create a base app object
 app = App()
+# Set on a shutdown signal; the main thread blocks on it until shutdown
+stop_event = threading.Event()
 
 
 def shutdown(exit_code: int = 0, error_msg: str = None, sig_id: int = None) -> None:
     """ Cleanly shutdown the application """
     sys.exit(exit_code)
 
-# Signal Handler: capture ctrl-C and clean exit
+# Signal Handler: capture ctrl-C / SIGTERM and wake the main thread
 def signal_handler(sig_id, frame):
-    shutdown(exit_code=0, sig_id=sig_id)
-signal.signal(signal.SIGINT, signal_handler)
+    stop_event.set()
+
+def start_signal_watcher() -> None:
+    """ Set stop_event when a shutdown signal arrives """
+    if not hasattr(signal, "pthread_sigmask"):
+        signal.signal(signal.SIGINT, signal_handler)
+        signal.signal(signal.SIGTERM, signal_handler)
+        return
+
+    def _sigwait():
+        signal.sigwait(SHUTDOWN_SIGNALS)
+        stop_event.set()
+    threading.Thread(target=_sigwait, name="signal-watcher", daemon=True).start()
 
 
 if __name__ == "__main__":
@@ -25,13 +44,13 @@ if __name__ == "__main__":
         sys.exit(0)
 
     
+    start_signal_watcher()
     # Start the application here
     app.logger.info("Press Ctrl-C to stop the server")
 
-    # Keep the main thread alive while the server is running
-    while True:
-        time.sleep(30)
+    # Keep the main thread parked until a shutdown signal is received
+    stop_event.wait()
 
     # Shut everything down
-    api.stop()
-    app.logger.info("Server stopped")
\ No newline at end of file
+    app.logger.info("Server stopped")
+    shutdown(exit_code=0)
@@ -2,102 +2,184 @@
 Application object for basic application information and command-line arguments and logging
 """
 import os
-import datetime
+import time
+import functools
 import logging
-import logging.config
 from logging import DEBUG, INFO, WARNING, ERROR, CRITICAL
 from dataclasses import dataclass
 from importlib import metadata
-from packaging.version import Version, parse
+from typing import TYPE_CHECKING
 from .config import LOGGING_CONFIG
 from .constants import BASE_DIR, LOG_LEVELS, LOG_FORMATS, DATE_FORMAT
 from .arguments import Arguments
+if TYPE_CHECKING:
+    from packaging.version import Version
 init_log: list[tuple[int, str]] = [] 
+# Year for the copyright notice, looked up once at import
+_YEAR = time.gmtime().tm_year
 
 class App:
     """ Base application configuration """
     # Must match pyproject.toml
     PROJECT_NAME = "quickstart-container"
+    # (logger name, level, format) of the last applied logging configuration
+    _logging_key: tuple | None = None
     
     def __init__(self) -> None:
-        # Set applcation defalts
-        # print(metadata.distribution(self.PROJECT_NAME)._path)
-
         # initialize application metadata
-        self.meta = AppMetadata(self.PROJECT_NAME, static_dir=f"{BASE_DIR}/static")
+        self.meta = AppMetadata.load(self.PROJECT_NAME, static_dir=f"{BASE_DIR}/static")
         init_log.append((INFO, f"Initializing application: {self.meta.name} v{self.meta.version} [license: {self.meta.license}]"))
         self.base_dir = BASE_DIR
-        init_log.append((DEBUG, f"Base directory set to: {self.base_dir}"))
         
         # initialize application arguments
         self.args = Arguments(self).args
         
         # initialize logging options
-        self.logger_config = LoggerConfig(self.args, logger_name=self.meta.name)
+        self.logger_config = LoggerConfig.from_args(self.args, name=self.meta.name)
+        # debug is the only level that emits DEBUG, so only format those messages when it is set
+        if self.logger_config.debug:
+            init_log.extend([
+                (DEBUG, f"Base directory set to: {self.base_dir}"),
+                (DEBUG, f"Distribution path: {_dist(self.PROJECT_NAME).locate_file('')}"),
+            ])
 
         # Setup logger
         self.logger = self._setup_logger()
 
         # Flush init log messages
-        for lvl, txt in init_log:
-            self.logger.log(lvl, txt)
-        init_log.clear()
+        self._flush_init_log()
 
     @property
     def name(self) -> str:
         """ Application name """
         return self.meta.name
     @property
-    def version(self) -> Version:
+    def version(self) -> str:
         """ Application version """
         return self.meta.version
 
+    def _flush_init_log(self) -> None:
+        """ Emit the queued init log messages with one locked write per handler """
+        fn, lno, func, _ = self.logger.findCaller()
+        records = [
+            self.logger.makeRecord(self.logger.name, lvl, fn, lno, txt, None, None, func)
+            for lvl, txt in init_log if self.logger.isEnabledFor(lvl)
+        ]
+        init_log.clear()
+        for handler in self.logger.handlers:
+            handled = [record for record in records if record.levelno >= handler.level and handler.filter(record)]
+            if not handled:
+                continue
+            if not isinstance(handler, logging.StreamHandler):
+                # e.g. the buffered handler: queue the batch and push it out now
+                for record in handled:
+                    handler.handle(record)
+                handler.flush()
+                continue
+            blob = "".join(handler.format(record) + handler.terminator for record in handled)
+            with handler.lock:
+                handler.stream.write(blob)
+                handler.flush()
+
     def _setup_logger(self) -> logging.Logger:
         """ Setup the application logger """
-        log_level = logging.getLevelName(self.logger_config.level.upper())
-
-        # customize the logging configuration
-        logging_config = LOGGING_CONFIG.copy()
-
-        logging_config["loggers"][self.logger_config.name] = logging_config["loggers"]["app"]
-        del(logging_config["loggers"]["app"])
-
-        for key, config in logging_config["loggers"].items():
-            config["level"] = self.logger_config.level.upper()
-        
-        logging_config["root"]["level"] = self.logger_config.level.upper()
-        logging_config["handlers"]["default"]["formatter"] = self.logger_config.format
-        logging_config["handlers"]["default"]["level"] = self.logger_config.level.upper()
-        logging.config.dictConfig(logging_config)
+        # Skip reconfiguring logging when nothing changed since the last App()
+        logging_key = (self.logger_config.name, self.logger_config.level, self.logger_config.format)
+        if logging_key != App._logging_key:
+            # imported here so --help / --version exits don't pay for it
+            from logging.config import dictConfig
+            # customize a copy of the logging configuration; LOGGING_CONFIG is a shared template.
+            # dictConfig pops keys from formatter and handler entries, so those get their own dicts.
+            level_no = self.logger_config.level_no
+            handlers = {name: dict(config) for name, config in LOGGING_CONFIG["handlers"].items()}
+            handlers["default"].update(formatter=self.logger_config.format, level=level_no)
+            logging_config = {
+                **LOGGING_CONFIG,
+                "formatters": {name: dict(config) for name, config in LOGGING_CONFIG["formatters"].items()},
+                "handlers": handlers,
+                # the template "app" logger becomes the application logger
+                "loggers": {
+                    (self.logger_config.name if name == "app" else name): {**config, "level": level_no}
+                    for name, config in LOGGING_CONFIG["loggers"].items()
+                },
+                "root": {**LOGGING_CONFIG["root"], "level": level_no},
+            }
+            dictConfig(logging_config)
+            App._logging_key = logging_key
 
         logger = logging.getLogger(self.logger_config.name)
-        logger.setLevel(self.logger_config.level.upper())
+        logger.setLevel(self.logger_config.level_no)
 
         return logger
 
+@functools.lru_cache(maxsize=None)
+def _dist(project_name: str) -> metadata.Distribution:
+    """ Locate the installed distribution once per process; its METADATA is parsed on first access """
+    return metadata.distribution(project_name)
+
+@functools.lru_cache(maxsize=None)
+def _parse_version(version: str) -> "Version":
+    """ Parse a version string on demand; packaging pulls in re and its PEP 440 parser """
+    from packaging.version import Version
+    return Version(version)
+
+@dataclass(frozen=True, slots=True)
 class AppMetadata:
     """ Application metadata dataclass """
-    def __init__(self, project_name: str, static_dir: str) -> None:
-        meta = metadata.metadata(project_name)
-        self.name = meta["Name"]
-        self.version = Version(meta["Version"])
-        self.description = meta["Summary"]
-        self.author = meta["Author-email"]
-        self.license = meta["License-Expression"]
-        self.static_dir = static_dir
-        self.copyright = f"\u00A9 {datetime.datetime.today().year} {self.author}"
-        self.footer = f"{self.name} | {self.copyright}"
+    name: str
+    version: str
+    description: str
+    author: str
+    license: str
+    static_dir: str
+    copyright: str
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def load(cls, project_name: str, static_dir: str) -> "AppMetadata":
+        """ Build the metadata from the installed package; the frozen result is shared by every App() """
+        meta = _dist(project_name).metadata
+        name = meta["Name"]
+        author = meta["Author-email"]
+        copyright = f"\u00A9 {_YEAR} {author}"
+        return cls(
+            name=name,
+            version=meta["Version"],
+            description=meta["Summary"],
+            author=author,
+            license=meta["License-Expression"],
+            static_dir=static_dir,
+            copyright=copyright,
+        )
+
+    @property
+    def footer(self) -> str:
+        """ Page footer text; built on access since nothing needs it at startup """
+        return f"{self.name} | {self.copyright}"
+
+    def parsed_version(self) -> "Version":
+        """ The version as a packaging Version, for comparisons """
+        return _parse_version(self.version)
 
       
+@dataclass(frozen=True, slots=True)
 class LoggerConfig:
     """ Logging options dataclass """
-    def __init__(self, args: Arguments, logger_name: str) -> None:
-        self.name = logger_name
-        self.debug = False
-        self.level = args.log_level if args.log_level in LOG_LEVELS else "info"
-        self.format = args.log_format if args.log_format in LOG_FORMATS else "default"
-        # if the log level is debug, force the log format to debug
-        if self.level == "debug":
-            self.debug = True
-            # self.format = "debug"
+    name: str
+    debug: bool
+    level: str
+    level_no: int
+    format: str
 
+    @classmethod
+    def from_args(cls, args: Arguments, name: str) -> "LoggerConfig":
+        level = args.log_level if args.log_level in LOG_LEVELS else "info"
+        debug = level == "debug"
+        return cls(
+            name=name,
+            debug=debug,
+            level=level,
+            level_no=logging.getLevelNamesMapping()[level.upper()],
+            # if the log level is debug, force the log format to debug
+            format="debug" if debug else (args.log_format if args.log_format in LOG_FORMATS else "default"),
+        )
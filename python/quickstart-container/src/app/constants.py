@@ -4,5 +4,7 @@ from pathlib import Path
 """ CONSTANTS """
 BASE_DIR: Path = Path(__file__).resolve().parent.parent
 DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
-LOG_LEVELS = ("debug", "info", "warning", "error")
+# ordered for display (argparse choices); LOG_LEVELS is the set used for membership checks
+LOG_LEVELS_ORDER = ("debug", "info", "warning", "error")
+LOG_LEVELS = frozenset(LOG_LEVELS_ORDER)
 LOG_FORMATS =("default", "minimal", "debug", "json")
\ No newline at end of file